@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import inspect
+import logging
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from models import db, InventoryTransaction, Product
+from signals import stock_changed
+
+logger = logging.getLogger(__name__)
+
+_STAGED_KEY = 'alert_staged'
+
+Alert = namedtuple('Alert', ['product_id', 'stock_quantity', 'reorder_threshold'])
+
+
+class AlertEngine:
+    def __init__(self):
+        self._at_risk = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def observe(self, product_id, stock_quantity, reorder_threshold):
+        stock_quantity = stock_quantity or 0
+        with self._lock:
+            previous = self._at_risk.get(product_id)
+            if reorder_threshold is None or stock_quantity >= reorder_threshold:
+                self._at_risk.pop(product_id, None)
+                return None
+            alert = Alert(product_id, stock_quantity, reorder_threshold)
+            self._at_risk[product_id] = alert
+        if alert != previous:
+            for listener in self._listeners:
+                listener(alert)
+        return alert
+
+    def read(self, product_ids, connection=None):
+        if not product_ids:
+            return []
+        stmt = (
+            select(Product.id, Product.stock_quantity, Product.reorder_threshold)
+            .where(Product.id.in_(list(product_ids)))
+        )
+        return (connection or db.session).execute(stmt).all()
+
+    def refresh(self, product_ids, connection=None):
+        for row in self.read(product_ids, connection):
+            self.observe(*row)
+
+    def load(self):
+        # The one catalog scan, at startup; afterwards the set is kept
+        # current from ledger and stock events.
+        with self._lock:
+            self._at_risk.clear()
+        rows = db.session.execute(
+            select(Product.id, Product.stock_quantity, Product.reorder_threshold)
+            .where(Product.reorder_threshold.is_not(None), Product.stock_quantity < Product.reorder_threshold)
+        ).all()
+        for row in rows:
+            self.observe(*row)
+
+    def at_risk(self):
+        with self._lock:
+            alerts = list(self._at_risk.values())
+        return sorted(alerts, key=lambda a: (a.stock_quantity - a.reorder_threshold, a.product_id))
+
+    def most_urgent(self, n):
+        with self._lock:
+            alerts = list(self._at_risk.values())
+        return heapq.nsmallest(n, alerts, key=lambda a: (a.stock_quantity - a.reorder_threshold, a.product_id))
+
+    def __len__(self):
+        return len(self._at_risk)
+
+
+class AlertDispatcher:
+    def __init__(self, notify, debounce=1.0):
+        self.notify = notify
+        self.debounce = debounce
+        self._loop = None
+        self._queue = asyncio.Queue()
+        self._backlog = []
+
+    def submit(self, alert):
+        if self._loop is None:
+            self._backlog.append(alert)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, alert)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        for alert in self._backlog:
+            self._queue.put_nowait(alert)
+        self._backlog.clear()
+
+        while True:
+            alert = await self._queue.get()
+            # Collect everything that arrives within the debounce window and
+            # dispatch only the latest alert per product.
+            pending = {alert.product_id: alert}
+            received = 1
+            deadline = self._loop.time() + self.debounce
+            while (remaining := deadline - self._loop.time()) > 0:
+                try:
+                    alert = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending[alert.product_id] = alert
+                received += 1
+            try:
+                result = self.notify(list(pending.values()))
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception('Failed to dispatch %d reorder alerts', len(pending))
+            for _ in range(received):
+                self._queue.task_done()
+
+    async def join(self):
+        await self._queue.join()
+
+
+alert_engine = AlertEngine()
+
+
+def _mark_for_refresh(target, product_id):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('alert_products', set()).add(product_id)
+
+
+@event.listens_for(InventoryTransaction, 'after_insert')
+def _transaction_inserted(mapper, connection, target):
+    _mark_for_refresh(target, target.product_id)
+
+
+@event.listens_for(Product, 'after_insert')
+@event.listens_for(Product, 'after_update')
+def _product_written(mapper, connection, target):
+    _mark_for_refresh(target, target.id)
+
+
+def _stage(session, rows):
+    # Stock read mid-transaction is only applied once it commits; a later
+    # read in the same transaction supersedes an earlier one.
+    staged = session.info.setdefault(_STAGED_KEY, {})
+    for row in rows:
+        staged[row[0]] = row
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _read_flushed(session, flush_context):
+    product_ids = session.info.pop('alert_products', None)
+    if product_ids:
+        _stage(session, alert_engine.read(product_ids, session.connection()))
+
+
+@stock_changed.connect
+def _read_changed_stock(sender, product_ids):
+    _stage(db.session(), alert_engine.read(product_ids))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed(session):
+    if session.in_nested_transaction():
+        return
+    for row in session.info.pop(_STAGED_KEY, {}).values():
+        alert_engine.observe(*row)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _reread_after_savepoint(session, previous_transaction):
+    # A savepoint rollback may undo some staged reads but not the outer
+    # transaction's; read the staged products again as they now stand.
+    staged = session.info.get(_STAGED_KEY)
+    if previous_transaction.parent is not None and staged and session.is_active:
+        _stage(session, alert_engine.read(list(staged), session.connection()))
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_uncommitted(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_STAGED_KEY, None)
+        session.info.pop('alert_products', None)
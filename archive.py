@@ -0,0 +1,153 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, inspect, insert, select, text, union_all
+
+from models import db, ArchiveWatermark, InventoryTransaction, Order, OrderItem, StockReservation
+
+archive_metadata = MetaData()
+
+MOVE_CHUNK_SIZE = 5000
+
+# Archived rows are moved by their own created_at month; child rows follow
+# the order they belong to.
+ARCHIVED = {
+    InventoryTransaction.__table__: (),
+    Order.__table__: (OrderItem.__table__, StockReservation.__table__),
+}
+
+# Rows that must stay hot regardless of age: an order with a live
+# reservation would otherwise take it out of reach of the expiry sweeper.
+HELD_BACK = {
+    Order.__table__: lambda order: (
+        select(StockReservation.id)
+        .where(StockReservation.order_id == order.c.id, StockReservation.status == 'active')
+        .exists()
+    ),
+}
+
+
+def _month_start(when):
+    return datetime(when.year, when.month, 1)
+
+
+def _next_month(when):
+    return datetime(when.year + when.month // 12, when.month % 12 + 1, 1)
+
+
+def archive_name(table, month):
+    return f'{table.name}_archive_{month:%Y_%m}'
+
+
+def archive_table(table, month):
+    name = archive_name(table, month)
+    if name in archive_metadata.tables:
+        return archive_metadata.tables[name]
+    columns = [Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False) for c in table.c]
+    archived = Table(name, archive_metadata, *columns)
+    for column in ('created_at', 'order_id', 'product_id'):
+        if column in archived.c:
+            Index(f'ix_{name}_{column}', archived.c[column])
+    return archived
+
+
+def archive_tables(table):
+    # Archive tables created by earlier processes are rediscovered by name.
+    prefix = f'{table.name}_archive_'
+    names = sorted(name for name in inspect(db.session.connection()).get_table_names() if name.startswith(prefix))
+    return [archive_table(table, datetime.strptime(name[len(prefix):], '%Y_%m')) for name in names]
+
+
+def watermark(table):
+    row = db.session.get(ArchiveWatermark, table.name)
+    return row.archived_before if row is not None else None
+
+
+def _move(source, target, condition):
+    columns = list(source.c)
+    db.session.execute(insert(target).from_select([c.name for c in columns], select(*columns).where(condition)))
+    db.session.execute(delete(source).where(condition))
+
+
+def _move_ids(table, children, targets, ids):
+    # The row set is fixed by id before anything moves, so a row committed
+    # or changed concurrently cannot be deleted without having been copied.
+    for start in range(0, len(ids), MOVE_CHUNK_SIZE):
+        chunk = ids[start:start + MOVE_CHUNK_SIZE]
+        for child, target in zip(children, targets[1:]):
+            _move(child, target, child.c.order_id.in_(chunk))
+        _move(table, targets[0], table.c.id.in_(chunk))
+
+
+def _advance_watermark(table, archived_before):
+    row = db.session.get(ArchiveWatermark, table.name)
+    if row is None:
+        db.session.add(ArchiveWatermark(table_name=table.name, archived_before=archived_before))
+    elif row.archived_before < archived_before:
+        row.archived_before = archived_before
+    db.session.flush()
+
+
+def archive_before(horizon, commit=True):
+    moved = {}
+    for table, children in ARCHIVED.items():
+        archivable = table.c.created_at < horizon
+        if table in HELD_BACK:
+            archivable &= ~HELD_BACK[table](table)
+        cursor = None
+        while True:
+            # Jump straight to the month of the next archivable row, so gaps
+            # in the data never create empty archive tables.
+            remaining = archivable if cursor is None else archivable & (table.c.created_at >= cursor)
+            oldest = db.session.execute(select(func.min(table.c.created_at)).where(remaining)).scalar()
+            if oldest is None:
+                break
+            month = _month_start(oldest)
+            end = min(_next_month(month), horizon)
+            in_month = remaining & (table.c.created_at >= month) & (table.c.created_at < end)
+            targets = [archive_table(t, month) for t in (table, *children)]
+            archive_metadata.create_all(db.session.connection(), tables=targets)
+
+            # FOR UPDATE (a no-op on SQLite) keeps new reservations from
+            # attaching to the selected orders until they have moved.
+            ids = db.session.execute(select(table.c.id).where(in_month).with_for_update()).scalars().all()
+            _move_ids(table, children, targets, ids)
+            moved[table.name] = moved.get(table.name, 0) + len(ids)
+
+            # The watermark and view move in the same transaction as the rows,
+            # so readers never see archived rows the routing does not know of.
+            _advance_watermark(table, end)
+            refresh_history_view(table)
+            if commit:
+                db.session.commit()
+            cursor = end
+
+        _advance_watermark(table, horizon)
+        if commit:
+            db.session.commit()
+    return moved
+
+
+def history(table):
+    archived = archive_tables(table)
+    if not archived:
+        return table
+    return union_all(select(table), *(select(t) for t in archived)).subquery(f'{table.name}_history')
+
+
+def refresh_history_view(table):
+    name = f'{table.name}_history'
+    preparer = db.engine.dialect.identifier_preparer
+    union = union_all(select(table), *(select(t) for t in archive_tables(table)))
+    compiled = union.compile(dialect=db.engine.dialect)
+    db.session.execute(text(f'DROP VIEW IF EXISTS {preparer.quote(name)}'))
+    db.session.execute(text(f'CREATE VIEW {preparer.quote(name)} AS {compiled}'))
+
+
+def source_for(table, since):
+    # Queries that start at or after the watermark only need the hot table.
+    archived_before = watermark(table)
+    if archived_before is None:
+        return history(table)
+    if since is not None and since >= archived_before:
+        return table
+    return history(table)
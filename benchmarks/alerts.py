@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import random
+import threading
+
+from sqlalchemy import insert
+
+from models import db, InventoryTransaction, Product
+from alerts import AlertDispatcher, AlertEngine, alert_engine
+from reservations import adjust_stock
+
+from benchmarks.common import Timer, create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reorder alert engine throughput')
+    parser.add_argument('--url')
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--events', type=int, default=200000, help='in-memory engine events')
+    parser.add_argument('--transactions', type=int, default=20000, help='ledger inserts through the ORM')
+    parser.add_argument('--per-commit', type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+
+    engine = AlertEngine()
+    with Timer() as timer:
+        for _ in range(args.events):
+            engine.observe(rng.randint(1, args.products), rng.randint(0, 100), 20)
+    with Timer() as query:
+        at_risk = engine.at_risk()
+    print(f'engine: {args.events / timer.elapsed:,.0f} events/sec, '
+          f'{len(at_risk)} at risk listed in {query.elapsed * 1000:.2f} ms')
+
+    notified = []
+    dispatcher = AlertDispatcher(lambda alerts: notified.append(len(alerts)), debounce=0.1)
+    alert_engine.subscribe(dispatcher.submit)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_until_complete, args=(dispatcher.run(),), daemon=True).start()
+
+    app = create_app(args.url)
+    with app.app_context():
+        db.session.execute(insert(Product.__table__), [
+            {'name': f'sku-{n}', 'price': 9.99, 'stock_quantity': 1000, 'reorder_threshold': 950}
+            for n in range(args.products)
+        ])
+        db.session.commit()
+        alert_engine.load()
+
+        with Timer() as timer:
+            for start in range(0, args.transactions, args.per_commit):
+                shipped = {}
+                for _ in range(min(args.per_commit, args.transactions - start)):
+                    product_id, quantity = rng.randint(1, args.products), rng.randint(1, 10)
+                    db.session.add(InventoryTransaction(product_id=product_id, transaction_type='out', quantity=quantity))
+                    shipped[product_id] = shipped.get(product_id, 0) + quantity
+                adjust_stock(shipped, -1)
+                db.session.commit()
+        with Timer() as query:
+            at_risk = alert_engine.at_risk()
+
+    with Timer() as drain:
+        asyncio.run_coroutine_threadsafe(dispatcher.join(), loop).result()
+    print(f'ledger: {args.transactions / timer.elapsed:,.0f} transactions/sec with alerting, '
+          f'{len(at_risk)} at risk listed in {query.elapsed * 1000:.2f} ms, '
+          f'{sum(notified)} alerts dispatched in {len(notified)} debounced batches '
+          f'(queue drained {drain.elapsed * 1000:.0f} ms after the last commit)')
+
+
+if __name__ == '__main__':
+    main()
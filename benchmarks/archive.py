@@ -0,0 +1,74 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from models import db, InventoryTransaction, Product
+from archive import archive_before, source_for
+
+from benchmarks.common import Timer, create_app, percentile
+
+NOW = datetime(2026, 1, 1)
+
+
+def recent_window_query(since):
+    ledger = source_for(InventoryTransaction.__table__, since)
+    return (
+        select(ledger.c.product_id, func.sum(ledger.c.quantity))
+        .where(ledger.c.created_at >= since)
+        .group_by(ledger.c.product_id)
+    )
+
+
+def latency_ms(build, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.session.execute(build()).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hot-window ledger latency as history grows')
+    parser.add_argument('--url')
+    parser.add_argument('--rows-per-day', type=int, default=300)
+    parser.add_argument('--days', type=int, default=30, help='history at scale 1x')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--horizon-days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    since = NOW - timedelta(days=7)
+    for scale in args.scales:
+        rng = random.Random(0)
+        app = create_app(args.url)
+        with app.app_context():
+            db.session.execute(insert(Product.__table__), [
+                {'name': f'sku-{n}', 'price': 9.99, 'stock_quantity': 0} for n in range(100)
+            ])
+            days = args.days * scale
+            for day in range(0, days, 30):
+                db.session.execute(insert(InventoryTransaction.__table__), [
+                    {'product_id': rng.randint(1, 100), 'transaction_type': 'in', 'quantity': 1,
+                     'created_at': NOW - timedelta(days=day + rng.random() * 30)}
+                    for _ in range(args.rows_per_day * min(30, days - day))
+                ])
+            db.session.commit()
+            total = args.rows_per_day * days
+
+            before = latency_ms(lambda: recent_window_query(since), args.repeat)
+            with Timer() as timer:
+                archive_before(NOW - timedelta(days=args.horizon_days))
+            after = latency_ms(lambda: recent_window_query(since), args.repeat)
+            full = latency_ms(lambda: recent_window_query(NOW - timedelta(days=days)), 3)
+
+        print(f'{scale:>4}x {total:>9} rows: hot window p50/p99 {after[0]:6.2f}/{after[1]:6.2f} ms '
+              f'(unarchived {before[0]:6.2f}/{before[1]:6.2f} ms), archived in {timer.elapsed:.1f}s, '
+              f'full-history union {full[0]:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
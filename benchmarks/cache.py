@@ -0,0 +1,64 @@
+import argparse
+import random
+import time
+
+from sqlalchemy import insert
+
+from models import db, Product
+from cache import LocalBackend, ProductCache, RedisBackend
+
+from benchmarks.common import create_app, percentile
+
+
+def measure(lookup, product_ids):
+    samples = []
+    for product_id in product_ids:
+        start = time.perf_counter()
+        lookup(product_id)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return f'p50 {percentile(samples, 50):8.1f} us  p99 {percentile(samples, 99):8.1f} us'
+
+
+def run(label, cache, product_ids):
+    cache.backend.clear()
+    cold = measure(cache.get, product_ids)
+    warm = measure(cache.get, product_ids)
+    print(f'{label:<8} cold: {cold}   warm: {warm}')
+    print(f'{"":<8} {cache.metrics()}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Product lookup latency, cold vs warm cache')
+    parser.add_argument('--url')
+    parser.add_argument('--redis-url', help='also benchmark a Redis backend, e.g. redis://localhost:6379/0')
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    parser.add_argument('--maxsize', type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    app = create_app(args.url)
+    with app.app_context():
+        db.session.execute(insert(Product.__table__), [
+            {'name': f'sku-{n}', 'price': 9.99, 'stock_quantity': n} for n in range(args.products)
+        ])
+        db.session.commit()
+        # Skewed access: most lookups hit a small set of hot products.
+        product_ids = [min(int(rng.paretovariate(1.2)), args.products) for _ in range(args.lookups)]
+
+        run('database', ProductCache(LocalBackend(maxsize=0)), product_ids)
+        run('local', ProductCache(LocalBackend(maxsize=args.maxsize)), product_ids)
+        if args.redis_url:
+            import redis
+            run('redis', ProductCache(RedisBackend(redis.Redis.from_url(args.redis_url))), product_ids)
+        else:
+            try:
+                import fakeredis
+            except ImportError:
+                pass
+            else:
+                run('fakeredis', ProductCache(RedisBackend(fakeredis.FakeRedis())), product_ids)
+
+
+if __name__ == '__main__':
+    main()
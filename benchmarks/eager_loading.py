@@ -0,0 +1,75 @@
+import argparse
+import random
+import sys
+
+from sqlalchemy import insert
+
+from models import db, ORDER_LOADING_PROFILES, Order, OrderItem, Product
+from instrumentation import QueryCounter
+
+from benchmarks.common import Timer, create_app
+
+
+def render(orders):
+    return [
+        (order.id, [(item.product.name, item.quantity) for item in order.order_items])
+        for order in orders
+    ]
+
+
+def lazy_page(page, per_page):
+    return Order.query.order_by(Order.created_at.desc(), Order.id.desc()).limit(per_page).offset((page - 1) * per_page).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Queries issued per order-list page by loading profile')
+    parser.add_argument('--url')
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=5, help='line items per order')
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 50, 100, 500])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    app = create_app(args.url)
+    unbounded = []
+    with app.app_context():
+        db.session.execute(insert(Product.__table__), [
+            {'name': f'sku-{n}', 'price': 9.99, 'stock_quantity': 0} for n in range(args.products)
+        ])
+        db.session.execute(insert(Order.__table__), [
+            {'customer_name': f'c{n}', 'customer_email': f'c{n}@example.com', 'total_amount': 0}
+            for n in range(args.orders)
+        ])
+        db.session.execute(insert(OrderItem.__table__), [
+            {'order_id': n // args.items + 1, 'product_id': rng.randint(1, args.products),
+             'quantity': 1, 'unit_price': 9.99}
+            for n in range(args.orders * args.items)
+        ])
+        db.session.commit()
+
+        loaders = {'lazy': lazy_page}
+        for profile in ORDER_LOADING_PROFILES:
+            loaders[profile] = lambda page, per_page, profile=profile: Order.page(page, per_page, profile)
+
+        print(f'{"profile":<10}' + ''.join(f'{size:>16}' for size in args.page_sizes))
+        for name, load in loaders.items():
+            cells = []
+            counts = set()
+            for per_page in args.page_sizes:
+                db.session.expunge_all()
+                with QueryCounter(db.engine) as counter, Timer() as timer:
+                    render(load(1, per_page))
+                counts.add(counter.count)
+                cells.append(f'{counter.count:>5} q {timer.elapsed * 1000:>6.1f} ms')
+            print(f'{name:<10}' + ''.join(f'{cell:>16}' for cell in cells))
+            if name != 'lazy' and len(counts) > 1:
+                unbounded.append(name)
+
+    if unbounded:
+        print(f'query count grows with page size for: {", ".join(unbounded)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
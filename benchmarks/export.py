@@ -0,0 +1,69 @@
+import argparse
+import io
+import os
+import random
+import resource
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from models import db, InventoryTransaction, Product
+from export import export_csv, export_jsonl, export_parquet, pq
+
+from benchmarks.common import Timer, create_app
+
+
+def peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming ledger export throughput and memory')
+    parser.add_argument('--url')
+    parser.add_argument('--rows', type=int, default=1000000, help='ledger rows (10000000 for the full run)')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    app = create_app(args.url)
+    with app.app_context():
+        db.session.add(Product(name='sku', price=1, stock_quantity=0))
+        db.session.flush()
+        for offset in range(0, args.rows, 100000):
+            db.session.execute(insert(InventoryTransaction.__table__), [
+                {'product_id': 1, 'transaction_type': rng.choice(['in', 'out']), 'quantity': rng.randint(1, 10),
+                 'notes': 'synthetic', 'created_at': start + timedelta(seconds=offset + n)}
+                for n in range(min(100000, args.rows - offset))
+            ])
+            db.session.commit()
+        print(f'seeded {args.rows} ledger rows, peak RSS {peak_rss_mib():.0f} MiB')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            def to_file(export, mode):
+                def run(path):
+                    with open(path, mode, newline='') as f:
+                        return export('inventory_transactions', f, batch_size=args.batch_size)
+                return run
+
+            formats = [('csv', to_file(export_csv, 'w')), ('jsonl', to_file(export_jsonl, 'w'))]
+            if pq is not None:
+                formats.append(('parquet', lambda path: export_parquet('inventory_transactions', path, batch_size=args.batch_size)))
+
+            for label, export in formats:
+                path = os.path.join(tmp, f'ledger.{label}')
+                with Timer() as timer:
+                    result = export(path)
+                db.session.rollback()
+                print(f'{label:>8}: {result.rows} rows in {timer.elapsed:.1f}s '
+                      f'({result.rows / timer.elapsed:,.0f} rows/sec), {os.path.getsize(path) / 2 ** 20:.0f} MiB written, '
+                      f'peak RSS {peak_rss_mib():.0f} MiB, watermark {result.watermark}')
+
+            middle = args.rows // 2
+            resumed = export_jsonl('inventory_transactions', io.StringIO(),
+                                   after=(start + timedelta(seconds=middle - 1), middle))
+            print(f'resumed after row {middle}: {resumed.rows} rows exported')
+
+if __name__ == '__main__':
+    main()
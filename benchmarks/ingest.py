@@ -0,0 +1,79 @@
+import argparse
+import random
+import tracemalloc
+
+from models import db, Order, OrderItem, InventoryTransaction, Product
+from ingest import DEFAULT_BATCH_SIZE, ingest_orders
+
+from benchmarks.common import Timer, create_app
+
+
+def synthetic_orders(count, product_ids, items_per_order, seed=0):
+    rng = random.Random(seed)
+    for n in range(count):
+        yield {
+            'customer_name': f'Customer {n}',
+            'customer_email': f'customer{n}@example.com',
+            'items': [
+                {'product_id': rng.choice(product_ids), 'quantity': rng.randint(1, 5), 'unit_price': 9.99}
+                for _ in range(items_per_order)
+            ],
+        }
+
+
+def ingest_naive(records):
+    count = 0
+    for record in records:
+        order = Order(
+            customer_name=record['customer_name'],
+            customer_email=record['customer_email'],
+            total_amount=sum(i['quantity'] * i['unit_price'] for i in record['items']),
+        )
+        db.session.add(order)
+        db.session.flush()
+        for item in record['items']:
+            db.session.add(OrderItem(order_id=order.id, product_id=item['product_id'],
+                                     quantity=item['quantity'], unit_price=item['unit_price']))
+            db.session.add(InventoryTransaction(product_id=item['product_id'], transaction_type='out',
+                                                quantity=item['quantity'], notes=f'Order {order.id}'))
+            product = db.session.get(Product, item['product_id'])
+            product.stock_quantity -= item['quantity']
+            db.session.flush()
+        count += 1
+    db.session.commit()
+    return count
+
+
+def run(label, app, ingest, args):
+    with app.app_context():
+        products = [Product(name=f'sku-{n}', price=9.99, stock_quantity=10 ** 9) for n in range(args.products)]
+        db.session.add_all(products)
+        db.session.commit()
+        records = synthetic_orders(args.orders, [p.id for p in products], args.items)
+
+        tracemalloc.start()
+        with Timer() as timer:
+            ingest(records)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    rows = args.orders * (1 + 2 * args.items)
+    print(f'{label:>6}: {rows} rows in {timer.elapsed:.2f}s ({rows / timer.elapsed:,.0f} rows/sec), '
+          f'peak {peak / 2 ** 20:.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk order ingestion vs per-object ORM inserts')
+    parser.add_argument('--url')
+    parser.add_argument('--orders', type=int, default=5000)
+    parser.add_argument('--items', type=int, default=10, help='line items per order')
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    run('naive', create_app(args.url), ingest_naive, args)
+    run('bulk', create_app(args.url), lambda records: ingest_orders(records, args.batch_size), args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, text
+
+from models import db, InventoryTransaction, Order, OrderItem, Product, StockReservation, StockSnapshot
+
+from benchmarks.common import Timer, create_app
+
+NOW = datetime(2026, 1, 1)
+
+
+def hot_queries(products, orders):
+    since = NOW - timedelta(days=7)
+    return {
+        'pending orders oldest first': lambda rng: (
+            select(Order).where(Order.status == 'pending').order_by(Order.created_at).limit(100)
+        ),
+        'recent orders': lambda rng: (
+            select(Order).where(Order.created_at >= NOW - timedelta(days=1)).order_by(Order.created_at)
+        ),
+        'items for order': lambda rng: select(OrderItem).where(OrderItem.order_id == rng.randint(1, orders)),
+        'items for product': lambda rng: select(OrderItem).where(OrderItem.product_id == rng.randint(1, products)),
+        'ledger for product in range': lambda rng: (
+            select(InventoryTransaction)
+            .where(
+                InventoryTransaction.product_id == rng.randint(1, products),
+                InventoryTransaction.created_at.between(since, NOW),
+            )
+            .order_by(InventoryTransaction.created_at)
+        ),
+        'recent ledger': lambda rng: (
+            select(InventoryTransaction).where(InventoryTransaction.created_at >= NOW - timedelta(hours=6))
+        ),
+        'expired reservations': lambda rng: (
+            select(StockReservation)
+            .where(StockReservation.status == 'active', StockReservation.expires_at <= NOW)
+            .limit(500)
+        ),
+        'latest snapshot before date': lambda rng: (
+            select(StockSnapshot.balance)
+            .where(StockSnapshot.product_id == rng.randint(1, products), StockSnapshot.period_start < since)
+            .order_by(StockSnapshot.period_start.desc())
+            .limit(1)
+        ),
+    }
+
+
+def seed(products, orders, items_per_order, ledger_rows, rng):
+    span = 365 * 24 * 3600
+    when = lambda: NOW - timedelta(seconds=rng.randrange(span))
+
+    db.session.execute(insert(Product.__table__), [
+        {'name': f'sku-{n}', 'price': 9.99, 'stock_quantity': 100} for n in range(products)
+    ])
+    db.session.execute(insert(Order.__table__), [
+        {'customer_name': f'c{n}', 'customer_email': f'c{n}@example.com', 'total_amount': 0,
+         'status': rng.choice(['pending', 'shipped', 'shipped', 'delivered', 'delivered', 'cancelled']),
+         'created_at': when()}
+        for n in range(orders)
+    ])
+    db.session.execute(insert(OrderItem.__table__), [
+        {'order_id': n // items_per_order + 1, 'product_id': rng.randint(1, products),
+         'quantity': 1, 'unit_price': 9.99}
+        for n in range(orders * items_per_order)
+    ])
+    db.session.execute(insert(InventoryTransaction.__table__), [
+        {'product_id': rng.randint(1, products), 'transaction_type': rng.choice(['in', 'out']),
+         'quantity': rng.randint(1, 10), 'created_at': when()}
+        for _ in range(ledger_rows)
+    ])
+    db.session.execute(insert(StockReservation.__table__), [
+        {'product_id': rng.randint(1, products), 'quantity': 1,
+         'status': rng.choice(['active', 'committed', 'released']),
+         'expires_at': when(), 'created_at': NOW}
+        for _ in range(orders)
+    ])
+    db.session.execute(insert(StockSnapshot.__table__), [
+        {'product_id': p, 'period_start': NOW - timedelta(days=d), 'net_quantity': 0, 'balance': 0}
+        for p in range(1, products + 1)
+        for d in range(0, 365, 7)
+    ])
+    db.session.commit()
+
+
+def query_plan(stmt):
+    dialect = db.engine.dialect.name
+    compiled = stmt.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    rows = db.session.execute(text(prefix + str(compiled))).all()
+    return [row[-1] if dialect == 'sqlite' else row[0] for row in rows]
+
+
+def uses_index(plan):
+    # SQLite reports a full walk of an index as "SCAN t USING INDEX ..."; that
+    # is as unbounded as a table scan, so only SEARCH lines pass.
+    for line in plan:
+        if line.startswith('SCAN') or 'TEMP B-TREE' in line:
+            return False
+        if 'Seq Scan' in line or line.lstrip().startswith('Sort'):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Assert hot queries use indexes and stay within time budgets')
+    parser.add_argument('--url')
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--items', type=int, default=3, help='line items per order')
+    parser.add_argument('--ledger', type=int, default=500000)
+    parser.add_argument('--threshold-ms', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    app = create_app(args.url)
+    failures = []
+    with app.app_context():
+        seed(args.products, args.orders, args.items, args.ledger, rng)
+        db.session.execute(text('ANALYZE'))
+
+        for name, build in hot_queries(args.products, args.orders).items():
+            plan = query_plan(build(rng))
+            with Timer() as timer:
+                for _ in range(args.repeat):
+                    db.session.execute(build(rng)).all()
+            elapsed_ms = timer.elapsed * 1000 / args.repeat
+
+            ok = uses_index(plan) and elapsed_ms <= args.threshold_ms
+            print(f'{"ok" if ok else "FAIL":>4}  {name:<30} {elapsed_ms:8.2f} ms  {" | ".join(plan)}')
+            if not ok:
+                failures.append(name)
+
+    if failures:
+        print(f'{len(failures)} hot queries regressed: {", ".join(failures)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
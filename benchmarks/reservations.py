@@ -0,0 +1,63 @@
+import argparse
+import threading
+
+from models import db, Product
+from reservations import InsufficientStock, commit_reservations, reserve_items
+
+from benchmarks.common import Timer, create_app
+
+
+def worker(app, product_ids, attempts, counts):
+    reserved = failed = 0
+    with app.app_context():
+        for i in range(attempts):
+            items = [(product_ids[(i + n) % len(product_ids)], 1) for n in range(len(product_ids))]
+            try:
+                commit_reservations(reserve_items(items))
+                db.session.commit()
+                reserved += 1
+            except InsufficientStock:
+                db.session.rollback()
+                failed += 1
+    counts.append((reserved, failed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent stock reservation throughput')
+    parser.add_argument('--url', help='database URL, e.g. postgresql://localhost/inventory (default: temp SQLite file)')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--attempts', type=int, default=500)
+    parser.add_argument('--skus', type=int, default=1, help='SKUs reserved together per order')
+    parser.add_argument('--stock', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app(args.url)
+    with app.app_context():
+        products = [Product(name=f'hot-{n}', price=9.99, stock_quantity=args.stock) for n in range(args.skus)]
+        db.session.add_all(products)
+        db.session.commit()
+        product_ids = [p.id for p in products]
+
+    counts = []
+    threads = [
+        threading.Thread(target=worker, args=(app, product_ids, args.attempts, counts))
+        for _ in range(args.threads)
+    ]
+    with Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    reserved = sum(r for r, _ in counts)
+    failed = sum(f for _, f in counts)
+    with app.app_context():
+        remaining = [p.stock_quantity for p in Product.query.order_by(Product.id)]
+
+    print(f'{args.url or "sqlite (temp file)"}: {reserved} reserved, {failed} rejected in {timer.elapsed:.2f}s '
+          f'({reserved / timer.elapsed:.0f} reservations/sec)')
+    print(f'remaining stock: {remaining} (expected {[max(args.stock - reserved, 0)] * args.skus})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import random
+
+from sqlalchemy import func, insert, select
+
+from models import db, Order, OrderItem
+from totals import line_items, np, order_totals, recompute_order_totals
+
+from benchmarks.common import Timer, create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute order totals in bulk')
+    parser.add_argument('--url')
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--items', type=int, default=3, help='line items per order')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    prices = [f'{rng.randint(1, 99999) / 100:.2f}' for _ in range(1000)]
+    app = create_app(args.url)
+    with app.app_context():
+        with Timer() as timer:
+            for start in range(0, args.orders, 100000):
+                count = min(100000, args.orders - start)
+                db.session.execute(insert(Order.__table__), [
+                    {'customer_name': 'c', 'customer_email': 'c@example.com', 'total_amount': 0}
+                    for _ in range(count)
+                ])
+                db.session.execute(insert(OrderItem.__table__), [
+                    {'order_id': start + n // args.items + 1, 'product_id': 1,
+                     'quantity': rng.randint(1, 5), 'unit_price': rng.choice(prices)}
+                    for n in range(count * args.items)
+                ])
+            db.session.commit()
+        print(f'seeded {args.orders} orders in {timer.elapsed:.1f}s')
+
+        with Timer() as timer:
+            updated = recompute_order_totals()
+            db.session.commit()
+        print(f'sql:    {updated} order totals recomputed in {timer.elapsed:.2f}s')
+
+        with Timer() as timer:
+            totals = order_totals(line_items())
+        print(f'{"numpy" if np is not None else "python"}: {len(totals)} order totals computed in memory in {timer.elapsed:.2f}s')
+
+        stored = db.session.execute(select(func.sum(Order.total_amount))).scalar()
+        print(f'grand total: stored {stored}, in memory {sum(totals.values())}')
+
+
+if __name__ == '__main__':
+    main()
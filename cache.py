@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from models import db, InventoryTransaction, Product
+from signals import stock_changed
+
+DEFAULT_TTL = 300
+
+_PENDING_KEY = 'product_cache_pending'
+
+
+class LocalBackend:
+    def __init__(self, maxsize=10000, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    # Works with any client exposing get/setex/delete/scan_iter, e.g. redis-py
+    # or fakeredis. Entries expire through Redis TTLs.
+
+    def __init__(self, client, ttl=DEFAULT_TTL, prefix='product:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(f'{self.prefix}{key}')
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        value['price'] = Decimal(value['price'])
+        return value
+
+    def set(self, key, value):
+        # Price travels as a string so the Decimal survives JSON exactly.
+        self.client.setex(f'{self.prefix}{key}', self.ttl, json.dumps(dict(value, price=str(value['price']))))
+
+    def delete(self, key):
+        self.client.delete(f'{self.prefix}{key}')
+
+    @property
+    def evictions(self):
+        # Evictions happen server-side under maxmemory; Redis only reports
+        # them instance-wide, so this counts keys of every application.
+        info = getattr(self.client, 'info', None)
+        if info is None:
+            return 0
+        return info('stats').get('evicted_keys', 0)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(f'{self.prefix}*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class ProductCache:
+    def __init__(self, backend=None):
+        self.backend = backend or LocalBackend()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, product_id):
+        value = self.backend.get(product_id)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        session = db.session()
+        row = session.execute(
+            select(Product.id, Product.name, Product.price, Product.stock_quantity)
+            .where(Product.id == product_id)
+        ).one_or_none()
+        if row is None:
+            return None
+        value = row._asdict()
+        # Never cache a row this transaction has written: it may still roll back.
+        if product_id not in session.info.get(_PENDING_KEY, ()):
+            self.backend.set(product_id, value)
+        return value
+
+    def invalidate(self, product_id):
+        self.invalidations += 1
+        self.backend.delete(product_id)
+
+    def invalidate_many(self, product_ids):
+        for product_id in product_ids:
+            self.invalidate(product_id)
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.backend.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+product_cache = ProductCache()
+
+
+def get_product(product_id):
+    return product_cache.get(product_id)
+
+
+def _written(session, product_ids):
+    # Drop the entries now so this transaction reads its own writes, and
+    # again once it ends so nothing cached in between outlives it.
+    session.info.setdefault(_PENDING_KEY, set()).update(product_ids)
+    product_cache.invalidate_many(product_ids)
+
+
+@event.listens_for(Product, 'after_update')
+@event.listens_for(Product, 'after_delete')
+def _invalidate_product(mapper, connection, target):
+    _written(object_session(target) or db.session(), [target.id])
+
+
+@event.listens_for(InventoryTransaction, 'after_insert')
+def _invalidate_transaction_product(mapper, connection, target):
+    _written(object_session(target) or db.session(), [target.product_id])
+
+
+@stock_changed.connect
+def _invalidate_changed_stock(sender, product_ids):
+    _written(db.session(), product_ids)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _invalidate_written(session, transaction):
+    # Only the outermost transaction settles what was written; a savepoint
+    # ending keeps the ids tracked until then.
+    if transaction.parent is None:
+        product_cache.invalidate_many(session.info.pop(_PENDING_KEY, ()))
@@ -0,0 +1,91 @@
+import csv
+import json
+from collections import namedtuple
+
+from sqlalchemy import DateTime, Integer, Numeric, select, tuple_
+
+from archive import history, source_for
+from models import db, InventoryTransaction, Order, OrderItem
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+DEFAULT_BATCH_SIZE = 10000
+
+ExportResult = namedtuple('ExportResult', ['rows', 'watermark'])
+
+# Keyset columns per table: exports are ordered by these and resume
+# strictly after the watermark of the previous run.
+EXPORTS = {
+    'orders': (Order.__table__, ('created_at', 'id')),
+    'order_items': (OrderItem.__table__, ('id',)),
+    'inventory_transactions': (InventoryTransaction.__table__, ('created_at', 'id')),
+}
+
+
+def iter_batches(name, after=None, batch_size=DEFAULT_BATCH_SIZE):
+    table, key_names = EXPORTS[name]
+    # Read through the archive so accounting exports keep rows that were
+    # moved out of the hot table; a created_at watermark can skip it.
+    if after is not None and key_names[0] == 'created_at':
+        source = source_for(table, after[0])
+    else:
+        source = history(table)
+    keys = [source.c[key] for key in key_names]
+    stmt = select(source).order_by(*keys)
+    if after is not None:
+        stmt = stmt.where(tuple_(*keys) > tuple_(*after))
+
+    result = db.session.connection().execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for rows in result.partitions():
+        last = rows[-1]._mapping
+        yield rows, tuple(last[key] for key in key_names)
+
+
+def export_csv(name, f, after=None, batch_size=DEFAULT_BATCH_SIZE):
+    table, _ = EXPORTS[name]
+    writer = csv.writer(f)
+    if after is None:
+        writer.writerow(table.c.keys())
+    count, watermark = 0, after
+    for rows, watermark in iter_batches(name, after, batch_size):
+        writer.writerows(rows)
+        count += len(rows)
+    return ExportResult(count, watermark)
+
+
+def export_jsonl(name, f, after=None, batch_size=DEFAULT_BATCH_SIZE):
+    count, watermark = 0, after
+    for rows, watermark in iter_batches(name, after, batch_size):
+        f.writelines(json.dumps(row._asdict(), default=str) + '\n' for row in rows)
+        count += len(rows)
+    return ExportResult(count, watermark)
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Numeric):
+        return pa.decimal128(column.type.precision, column.type.scale)
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us')
+    return pa.string()
+
+
+def export_parquet(name, path, after=None, batch_size=DEFAULT_BATCH_SIZE):
+    if pq is None:
+        raise ImportError('export_parquet() requires pyarrow')
+    table, _ = EXPORTS[name]
+    schema = pa.schema([(column.name, _arrow_type(column)) for column in table.c])
+    count, watermark = 0, after
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows, watermark in iter_batches(name, after, batch_size):
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)],
+                schema=schema,
+            ))
+            count += len(rows)
+    return ExportResult(count, watermark)
@@ -0,0 +1,135 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+
+from sqlalchemy import insert, select
+
+from models import db, Order, OrderItem, InventoryTransaction, Product
+from reservations import adjust_stock
+from snapshots import record_ledger_rows
+from totals import CENT
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _batches(records, size):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _missing_prices(batch):
+    product_ids = {
+        item['product_id']
+        for record in batch
+        for item in record['items']
+        if item.get('unit_price') is None
+    }
+    if not product_ids:
+        return {}
+    return dict(db.session.execute(
+        select(Product.id, Product.price).where(Product.id.in_(product_ids))
+    ).all())
+
+
+def _catalog_price(prices, product_id):
+    try:
+        return prices[product_id]
+    except KeyError:
+        raise ValueError(f'Unknown product {product_id} in order without unit_price') from None
+
+
+def _money(value):
+    # Going through str keeps float noise out of Decimal; quantize drops
+    # what is left below the column's two decimal places.
+    return Decimal(str(value)).quantize(CENT)
+
+
+def _created_at(record, default):
+    created_at = record.get('created_at')
+    if created_at is None:
+        return default
+    if isinstance(created_at, str):
+        return datetime.fromisoformat(created_at)
+    return created_at
+
+
+def _ingest_batch(batch):
+    now = datetime.utcnow()
+    prices = _missing_prices(batch)
+
+    order_rows = []
+    order_items = []
+    for record in batch:
+        items = [
+            {
+                'product_id': item['product_id'],
+                'quantity': item['quantity'],
+                'unit_price': (
+                    _catalog_price(prices, item['product_id']) if item.get('unit_price') is None
+                    else _money(item['unit_price'])
+                ),
+            }
+            for item in record['items']
+        ]
+        total = record.get('total_amount')
+        if total is None:
+            total = sum(item['quantity'] * item['unit_price'] for item in items)
+        else:
+            total = _money(total)
+        order_rows.append({
+            'customer_name': record['customer_name'],
+            'customer_email': record['customer_email'],
+            'total_amount': total,
+            'status': record.get('status', 'pending'),
+            'created_at': _created_at(record, now),
+        })
+        order_items.append(items)
+
+    order_table = Order.__table__
+    order_ids = db.session.scalars(
+        insert(order_table).returning(order_table.c.id, sort_by_parameter_order=True),
+        order_rows,
+    ).all()
+
+    item_rows = []
+    transaction_rows = []
+    shipped = {}
+    for order_id, items, order_row in zip(order_ids, order_items, order_rows):
+        for item in items:
+            item_rows.append(dict(item, order_id=order_id))
+            transaction_rows.append({
+                'product_id': item['product_id'],
+                'transaction_type': 'out',
+                'quantity': item['quantity'],
+                'notes': f'Order {order_id}',
+                'created_at': order_row['created_at'],
+            })
+            shipped[item['product_id']] = shipped.get(item['product_id'], 0) + item['quantity']
+
+    if item_rows:
+        db.session.execute(insert(OrderItem.__table__), item_rows)
+        db.session.execute(insert(InventoryTransaction.__table__), transaction_rows)
+        record_ledger_rows(db.session.connection(), transaction_rows)
+        adjust_stock(shipped, -1)
+    return order_ids
+
+
+def ingest_orders(records, batch_size=DEFAULT_BATCH_SIZE, commit=True):
+    count = 0
+    for batch in _batches(records, batch_size):
+        count += len(_ingest_batch(batch))
+        if commit:
+            db.session.commit()
+    return count
@@ -0,0 +1,52 @@
+import random
+import time
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+
+def _count_sampled_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and '_sampled_queries' in g:
+        g._sampled_queries += 1
+
+
+def init_query_sampling(app, db, sample_rate=0.01, report=None):
+    if report is None:
+        def report(endpoint, queries, elapsed):
+            app.logger.info('%s issued %d queries in %.1f ms', endpoint, queries, elapsed * 1000)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_sampled_query)
+
+    @app.before_request
+    def _start_sampling():
+        if random.random() < sample_rate:
+            g._sampled_queries = 0
+            g._sampled_started = time.perf_counter()
+
+    @app.after_request
+    def _report_sampling(response):
+        if '_sampled_queries' in g:
+            report(request.endpoint, g._sampled_queries, time.perf_counter() - g._sampled_started)
+        return response
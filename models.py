@@ -1,16 +1,27 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
 from datetime import datetime
 
 db = SQLAlchemy()
 
+ORDER_LOADING_PROFILES = {
+    'selectin': selectinload,
+    'joined': joinedload,
+    'subquery': subqueryload,
+}
+
 class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Numeric(12, 2), nullable=False)
     stock_quantity = db.Column(db.Integer, default=0)
+    reorder_threshold = db.Column(db.Integer)
+    version = db.Column(db.Integer, nullable=False, server_default='1')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __mapper_args__ = {'version_id_col': version}
+    
     def __repr__(self):
         return f'<Product {self.name}>'
 
@@ -18,21 +29,33 @@ class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     customer_name = db.Column(db.String(100), nullable=False)
     customer_email = db.Column(db.String(100), nullable=False)
-    total_amount = db.Column(db.Float, nullable=False)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False)
     status = db.Column(db.String(20), default='pending')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    __table_args__ = (db.Index('ix_order_status_created_at', 'status', 'created_at'),)
     
     order_items = db.relationship('OrderItem', backref='order', lazy=True)
     
+    @classmethod
+    def with_items(cls, profile='selectin'):
+        loader = ORDER_LOADING_PROFILES[profile]
+        return cls.query.options(loader(cls.order_items).options(loader(OrderItem.product)))
+    
+    @classmethod
+    def page(cls, page=1, per_page=50, profile='selectin'):
+        query = cls.with_items(profile).order_by(cls.created_at.desc(), cls.id.desc())
+        return query.limit(per_page).offset((page - 1) * per_page).all()
+    
     def __repr__(self):
         return f'<Order {self.id}>'
 
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False, index=True)
     quantity = db.Column(db.Integer, nullable=False)
-    unit_price = db.Column(db.Float, nullable=False)
+    unit_price = db.Column(db.Numeric(12, 2), nullable=False)
     
     product = db.relationship('Product', backref='order_items')
     
@@ -45,9 +68,51 @@ class InventoryTransaction(db.Model):
     transaction_type = db.Column(db.String(10), nullable=False)  # 'in' or 'out'
     quantity = db.Column(db.Integer, nullable=False)
     notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    __table_args__ = (
+        db.Index('ix_inventory_transaction_product_id_created_at', 'product_id', 'created_at'),
+    )
     
     product = db.relationship('Product', backref='transactions')
     
     def __repr__(self):
-        return f'<InventoryTransaction {self.id}>'
\ No newline at end of file
+        return f'<InventoryTransaction {self.id}>'
+
+class StockReservation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), index=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='active')  # 'active', 'committed' or 'released'
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_stock_reservation_status_expires_at', 'status', 'expires_at'),)
+    
+    product = db.relationship('Product', backref='reservations')
+    order = db.relationship('Order', backref='reservations')
+    
+    def __repr__(self):
+        return f'<StockReservation {self.id}>'
+
+class StockSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
+    period_start = db.Column(db.DateTime, nullable=False)
+    net_quantity = db.Column(db.Integer, nullable=False, default=0)  # ledger change within the period
+    balance = db.Column(db.Integer, nullable=False, default=0)  # running ledger balance at period end
+    
+    __table_args__ = (db.UniqueConstraint('product_id', 'period_start'),)
+    
+    product = db.relationship('Product', backref='snapshots')
+    
+    def __repr__(self):
+        return f'<StockSnapshot {self.product_id} {self.period_start:%Y-%m-%d}>'
+
+class ArchiveWatermark(db.Model):
+    table_name = db.Column(db.String(100), primary_key=True)
+    archived_before = db.Column(db.DateTime, nullable=False)  # rows older than this live in archive tables
+    
+    def __repr__(self):
+        return f'<ArchiveWatermark {self.table_name} {self.archived_before}>'
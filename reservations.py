@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, insert, update
+
+from models import db, InventoryTransaction, Product, StockReservation
+from signals import stock_changed
+from snapshots import record_ledger_rows
+
+DEFAULT_RESERVATION_TTL = timedelta(minutes=15)
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f'Insufficient stock for products {self.product_ids}')
+
+
+def _quantities_by_product(items):
+    quantities = {}
+    for product_id, quantity in items:
+        if quantity <= 0:
+            raise ValueError(f'Reservation quantity must be positive, got {quantity}')
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def adjust_stock(quantities, sign, require_stock=False):
+    # One UPDATE for every SKU: the per-product amount comes from a CASE on
+    # the primary key, and the stock guard makes the decrement atomic
+    # without holding locks across a read-modify-write.
+    amount = case(quantities, value=Product.id)
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(list(quantities)))
+        .values(
+            stock_quantity=Product.stock_quantity + sign * amount,
+            version=Product.version + 1,
+        )
+        .returning(Product.id)
+        .execution_options(synchronize_session='fetch')
+    )
+    if require_stock:
+        stmt = stmt.where(Product.stock_quantity >= amount)
+    changed = set(db.session.execute(stmt).scalars())
+    if changed:
+        stock_changed.send(None, product_ids=changed)
+    return changed
+
+
+def reserve_items(items, order_id=None, ttl=DEFAULT_RESERVATION_TTL):
+    quantities = _quantities_by_product(items)
+    if not quantities:
+        return []
+
+    reserved = adjust_stock(quantities, -1, require_stock=True)
+    if len(reserved) != len(quantities):
+        if reserved:
+            adjust_stock({pid: quantities[pid] for pid in reserved}, 1)
+        raise InsufficientStock(set(quantities) - reserved)
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            'product_id': product_id,
+            'order_id': order_id,
+            'quantity': quantity,
+            'status': 'active',
+            'expires_at': now + ttl,
+            'created_at': now,
+        }
+        for product_id, quantity in quantities.items()
+    ]
+    return db.session.scalars(
+        insert(StockReservation).returning(StockReservation, sort_by_parameter_order=True),
+        rows,
+    ).all()
+
+
+def reserve_order(order, ttl=DEFAULT_RESERVATION_TTL):
+    items = [(item.product_id, item.quantity) for item in order.order_items]
+    return reserve_items(items, order_id=order.id, ttl=ttl)
+
+
+def commit_reservations(reservations):
+    ids = [r.id for r in reservations]
+    if not ids:
+        return 0
+    committed = db.session.execute(
+        update(StockReservation)
+        .where(StockReservation.id.in_(ids), StockReservation.status == 'active')
+        .values(status='committed')
+        .returning(StockReservation.id, StockReservation.product_id, StockReservation.quantity)
+        .execution_options(synchronize_session='evaluate')
+    ).all()
+    if not committed:
+        return 0
+
+    # Committed stock has left for good, so it goes on the ledger; only
+    # active reservations stay off it.
+    now = datetime.utcnow()
+    rows = [
+        {
+            'product_id': product_id,
+            'transaction_type': 'out',
+            'quantity': quantity,
+            'notes': f'Reservation {reservation_id}',
+            'created_at': now,
+        }
+        for reservation_id, product_id, quantity in committed
+    ]
+    db.session.execute(insert(InventoryTransaction.__table__), rows)
+    record_ledger_rows(db.session.connection(), rows)
+    return len(committed)
+
+
+def _release(condition):
+    # Claiming the rows and reading their quantities in one statement keeps
+    # two concurrent sweepers from returning the same stock twice.
+    released = db.session.execute(
+        update(StockReservation)
+        .where(StockReservation.status == 'active', condition)
+        .values(status='released')
+        .returning(StockReservation.product_id, StockReservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if released:
+        adjust_stock(_quantities_by_product(released), 1)
+    return len(released)
+
+
+def release_reservations(reservations):
+    ids = [r.id for r in reservations]
+    if not ids:
+        return 0
+    count = _release(StockReservation.id.in_(ids))
+    for reservation in reservations:
+        db.session.expire(reservation, ['status'])
+    return count
+
+
+def release_expired_reservations(now=None):
+    return _release(StockReservation.expires_at <= (now or datetime.utcnow()))
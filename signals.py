@@ -0,0 +1,7 @@
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Sent with product_ids=... whenever stock is changed by a bulk statement
+# that bypasses ORM attribute events.
+stock_changed = _signals.signal('stock-changed')
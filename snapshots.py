@@ -0,0 +1,200 @@
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, delete, event, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from archive import history, source_for
+from models import db, InventoryTransaction, Product, StockReservation, StockSnapshot
+
+
+_DIALECT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def period_start(when):
+    return datetime(when.year, when.month, when.day)
+
+
+def signed_quantity(transaction_type, quantity):
+    return quantity if transaction_type == 'in' else -quantity
+
+
+def _signed_quantity_column(ledger):
+    return case((ledger.c.transaction_type == 'in', ledger.c.quantity), else_=-ledger.c.quantity)
+
+
+def _upsert(dialect_name):
+    try:
+        dialect_insert = _DIALECT_INSERTS[dialect_name]
+    except KeyError:
+        raise NotImplementedError(f'Stock snapshots need ON CONFLICT support, not available on {dialect_name}')
+
+    snapshot = StockSnapshot.__table__
+    previous = (
+        select(snapshot.c.balance)
+        .where(snapshot.c.product_id == bindparam('product_id'), snapshot.c.period_start < bindparam('period_start'))
+        .order_by(snapshot.c.period_start.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = dialect_insert(snapshot).values(
+        product_id=bindparam('product_id'),
+        period_start=bindparam('period_start'),
+        net_quantity=bindparam('delta'),
+        balance=func.coalesce(previous, 0) + bindparam('delta'),
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[snapshot.c.product_id, snapshot.c.period_start],
+        set_={
+            'net_quantity': snapshot.c.net_quantity + stmt.excluded.net_quantity,
+            'balance': snapshot.c.balance + stmt.excluded.net_quantity,
+        },
+    )
+
+
+def record_ledger_rows(connection, rows):
+    deltas = {}
+    for row in rows:
+        key = (row['product_id'], period_start(row['created_at']))
+        deltas[key] = deltas.get(key, 0) + signed_quantity(row['transaction_type'], row['quantity'])
+    params = [
+        {'product_id': product_id, 'period_start': start, 'delta': delta}
+        for (product_id, start), delta in sorted(deltas.items())
+        if delta != 0
+    ]
+    if not params:
+        return
+
+    # Back-dated rows also shift the running balance of every later period
+    # that already exists; this runs first so the upserts below see it.
+    snapshot = StockSnapshot.__table__
+    connection.execute(
+        update(snapshot)
+        .where(snapshot.c.product_id == bindparam('shift_product_id'), snapshot.c.period_start > bindparam('shift_start'))
+        .values(balance=snapshot.c.balance + bindparam('shift_delta')),
+        [{'shift_product_id': p['product_id'], 'shift_start': p['period_start'], 'shift_delta': p['delta']} for p in params],
+    )
+
+    # A new period's opening balance is read from the row before it, so a
+    # product's periods go out in separate rounds, oldest first; a batch
+    # covering a single day per product is one statement.
+    rounds = []
+    seen = {}
+    for p in params:
+        n = seen[p['product_id']] = seen.get(p['product_id'], -1) + 1
+        if n == len(rounds):
+            rounds.append([])
+        rounds[n].append(p)
+    upsert = _upsert(connection.dialect.name)
+    for batch in rounds:
+        connection.execute(upsert, batch)
+
+
+@event.listens_for(InventoryTransaction, 'after_insert')
+def _record_transaction(mapper, connection, target):
+    record_ledger_rows(connection, [{
+        'product_id': target.product_id,
+        'transaction_type': target.transaction_type,
+        'quantity': target.quantity,
+        'created_at': target.created_at or datetime.utcnow(),
+    }])
+
+
+def stock_at(product_id, when):
+    start = period_start(when)
+    base = db.session.execute(
+        select(StockSnapshot.balance)
+        .where(StockSnapshot.product_id == product_id, StockSnapshot.period_start < start)
+        .order_by(StockSnapshot.period_start.desc())
+        .limit(1)
+    ).scalar() or 0
+    ledger = source_for(InventoryTransaction.__table__, start)
+    delta = db.session.execute(
+        select(func.coalesce(func.sum(_signed_quantity_column(ledger)), 0))
+        .where(
+            ledger.c.product_id == product_id,
+            ledger.c.created_at >= start,
+            ledger.c.created_at <= when,
+        )
+    ).scalar()
+    return base + delta
+
+
+def _latest_snapshots():
+    latest = (
+        select(StockSnapshot.product_id, func.max(StockSnapshot.period_start).label('period_start'))
+        .group_by(StockSnapshot.product_id)
+        .subquery()
+    )
+    return (
+        select(StockSnapshot.product_id, StockSnapshot.balance)
+        .join(latest, (StockSnapshot.product_id == latest.c.product_id)
+              & (StockSnapshot.period_start == latest.c.period_start))
+        .subquery()
+    )
+
+
+def _reserved_quantities():
+    # Active reservations hold stock without a ledger row yet; committing
+    # one writes its 'out' transaction.
+    return (
+        select(StockReservation.product_id, func.sum(StockReservation.quantity).label('quantity'))
+        .where(StockReservation.status == 'active')
+        .group_by(StockReservation.product_id)
+        .subquery()
+    )
+
+
+def reconcile(product_ids=None):
+    latest = _latest_snapshots()
+    reserved = _reserved_quantities()
+    balance = func.coalesce(latest.c.balance, 0)
+    reserved_quantity = func.coalesce(reserved.c.quantity, 0)
+    stmt = (
+        select(
+            Product.id,
+            Product.stock_quantity,
+            balance.label('ledger_balance'),
+            reserved_quantity.label('reserved_quantity'),
+        )
+        .outerjoin(latest, latest.c.product_id == Product.id)
+        .outerjoin(reserved, reserved.c.product_id == Product.id)
+        .where(func.coalesce(Product.stock_quantity, 0) + reserved_quantity != balance)
+        .order_by(Product.id)
+    )
+    if product_ids is not None:
+        stmt = stmt.where(Product.id.in_(product_ids))
+    return db.session.execute(stmt).all()
+
+
+def rebuild_snapshots(batch_size=10000):
+    db.session.execute(delete(StockSnapshot))
+    ledger = history(InventoryTransaction.__table__)
+    rows = db.session.execute(
+        select(ledger.c.product_id, ledger.c.transaction_type, ledger.c.quantity, ledger.c.created_at)
+        .order_by(ledger.c.product_id, ledger.c.created_at)
+        .execution_options(yield_per=batch_size)
+    )
+
+    count = 0
+    pending = []
+    current = None
+    balance = 0
+    for product_id, transaction_type, quantity, created_at in rows:
+        start = period_start(created_at)
+        if current is None or current['product_id'] != product_id:
+            balance = 0
+            current = None
+        if current is None or current['period_start'] != start:
+            if len(pending) >= batch_size:
+                db.session.execute(insert(StockSnapshot.__table__), pending)
+                count += len(pending)
+                pending = []
+            current = {'product_id': product_id, 'period_start': start, 'net_quantity': 0, 'balance': balance}
+            pending.append(current)
+        delta = signed_quantity(transaction_type, quantity)
+        current['net_quantity'] += delta
+        current['balance'] += delta
+        balance = current['balance']
+    if pending:
+        db.session.execute(insert(StockSnapshot.__table__), pending)
+    return count + len(pending)
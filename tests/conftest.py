@@ -0,0 +1,23 @@
+import pytest
+from flask import Flask
+
+from models import db, Product
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def product(app):
+    product = Product(name='Widget', price=2, stock_quantity=10)
+    db.session.add(product)
+    db.session.commit()
+    return product
@@ -0,0 +1,107 @@
+import asyncio
+
+from models import db, Product
+from alerts import Alert, AlertDispatcher, AlertEngine
+
+
+def test_engine_tracks_only_products_below_threshold():
+    engine = AlertEngine()
+    engine.observe(1, 3, 5)
+    engine.observe(2, 9, 5)
+    engine.observe(3, 0, 4)
+    assert [a.product_id for a in engine.at_risk()] == [3, 1]
+
+    engine.observe(3, 10, 4)
+    assert engine.at_risk() == [Alert(1, 3, 5)]
+
+
+def test_dispatcher_debounces_and_survives_notify_errors():
+    batches = []
+
+    def notify(alerts):
+        batches.append(sorted(alerts))
+        if len(batches) == 1:
+            raise RuntimeError('notification backend down')
+
+    async def scenario():
+        dispatcher = AlertDispatcher(notify, debounce=0.01)
+        task = asyncio.create_task(dispatcher.run())
+        await asyncio.sleep(0)
+        dispatcher.submit(Alert(1, 3, 5))
+        dispatcher.submit(Alert(1, 2, 5))
+        await asyncio.sleep(0.05)
+        dispatcher.submit(Alert(2, 0, 5))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert batches == [[Alert(1, 2, 5)], [Alert(2, 0, 5)]]
+
+
+def test_at_risk_set_follows_commits_not_flushes(app, monkeypatch):
+    import alerts
+    engine = AlertEngine()
+    monkeypatch.setattr(alerts, 'alert_engine', engine)
+    product = Product(name='Widget', price=2, stock_quantity=10, reorder_threshold=5)
+    db.session.add(product)
+    db.session.commit()
+
+    product.stock_quantity = 0
+    db.session.flush()
+    assert engine.at_risk() == []
+    db.session.rollback()
+    assert engine.at_risk() == []
+
+    product.stock_quantity = 2
+    db.session.commit()
+    assert engine.at_risk() == [Alert(product.id, 2, 5)]
+
+
+def test_bulk_stock_change_is_applied_on_commit(app, monkeypatch):
+    import alerts
+    from reservations import reserve_items
+    engine = AlertEngine()
+    monkeypatch.setattr(alerts, 'alert_engine', engine)
+    product = Product(name='Widget', price=2, stock_quantity=10, reorder_threshold=5)
+    db.session.add(product)
+    db.session.commit()
+
+    reserve_items([(product.id, 8)])
+    assert engine.at_risk() == []
+    db.session.commit()
+    assert engine.at_risk() == [Alert(product.id, 2, 5)]
+
+
+def test_savepoint_rollback_keeps_outer_stock_change(app, monkeypatch):
+    import alerts
+    engine = AlertEngine()
+    monkeypatch.setattr(alerts, 'alert_engine', engine)
+    product = Product(name='Widget', price=2, stock_quantity=10, reorder_threshold=5)
+    db.session.add(product)
+    db.session.commit()
+
+    product.stock_quantity = 1
+    db.session.flush()
+    db.session.begin_nested().rollback()
+    db.session.commit()
+    assert engine.at_risk() == [Alert(product.id, 1, 5)]
+
+
+def test_savepoint_rollback_undoes_its_own_stock_change(app, monkeypatch):
+    import alerts
+    engine = AlertEngine()
+    monkeypatch.setattr(alerts, 'alert_engine', engine)
+    product = Product(name='Widget', price=2, stock_quantity=10, reorder_threshold=5)
+    db.session.add(product)
+    db.session.commit()
+
+    product.stock_quantity = 6
+    db.session.flush()
+    savepoint = db.session.begin_nested()
+    product.stock_quantity = 0
+    db.session.flush()
+    savepoint.rollback()
+    db.session.commit()
+    assert engine.at_risk() == []
+    assert db.session.get(Product, product.id).stock_quantity == 6
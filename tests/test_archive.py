@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+from models import db, ArchiveWatermark, InventoryTransaction, Order, OrderItem, Product, StockReservation
+from archive import archive_before, history, source_for
+from reservations import commit_reservations, release_expired_reservations, reserve_items
+
+
+def add_order(product, created_at, quantity=1):
+    order = Order(customer_name='Ada', customer_email='ada@example.com', total_amount=2, created_at=created_at)
+    db.session.add(order)
+    db.session.flush()
+    db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=quantity, unit_price=2))
+    db.session.flush()
+    return order
+
+
+def test_orders_with_active_reservations_stay_hot(product):
+    held = add_order(product, datetime(2020, 6, 1), quantity=3)
+    reserve_items([(product.id, 3)], order_id=held.id, ttl=timedelta(seconds=-1))
+    done = add_order(product, datetime(2020, 6, 2))
+    commit_reservations(reserve_items([(product.id, 1)], order_id=done.id))
+    db.session.commit()
+    held_id, done_id = held.id, done.id
+
+    archive_before(datetime(2021, 1, 1))
+
+    assert [o.id for o in Order.query] == [held_id]
+    assert StockReservation.query.filter_by(status='active').count() == 1
+    assert release_expired_reservations() == 1
+    db.session.commit()
+    assert db.session.get(Product, product.id).stock_quantity == 9
+
+    orders = history(Order.__table__)
+    assert db.session.execute(db.select(orders.c.id).order_by(orders.c.id)).scalars().all() == [held_id, done_id]
+
+
+def test_archived_ledger_still_reachable(product):
+    for month in range(1, 5):
+        db.session.add(InventoryTransaction(
+            product_id=product.id, transaction_type='in', quantity=1, created_at=datetime(2020, month, 15),
+        ))
+    db.session.commit()
+
+    archive_before(datetime(2020, 3, 1))
+
+    ledger = InventoryTransaction.__table__
+    assert InventoryTransaction.query.count() == 2
+    assert source_for(ledger, datetime(2020, 3, 1)) is ledger
+    everything = source_for(ledger, datetime(2020, 1, 1))
+    assert db.session.execute(db.select(db.func.count()).select_from(everything)).scalar() == 4
+
+
+def test_watermark_advances_with_each_month(product, monkeypatch):
+    import archive
+    for month in range(1, 4):
+        db.session.add(InventoryTransaction(
+            product_id=product.id, transaction_type='in', quantity=1, created_at=datetime(2020, month, 15),
+        ))
+    db.session.commit()
+
+    months_moved = []
+    original = archive._move
+
+    def move(source, target, condition):
+        original(source, target, condition)
+        if months_moved:
+            raise RuntimeError('crash during the second month')
+        months_moved.append(target.name)
+
+    monkeypatch.setattr(archive, '_move', move)
+    try:
+        archive_before(datetime(2020, 4, 1))
+    except RuntimeError:
+        db.session.rollback()
+
+    ledger = InventoryTransaction.__table__
+    assert archive.watermark(ledger) == datetime(2020, 2, 1)
+    assert InventoryTransaction.query.count() == 2
+    everything = source_for(ledger, datetime(2020, 1, 1))
+    assert db.session.execute(db.select(db.func.count()).select_from(everything)).scalar() == 3
+
+
+def test_source_for_without_watermark_uses_history(product):
+    db.session.add(InventoryTransaction(
+        product_id=product.id, transaction_type='in', quantity=1, created_at=datetime(2020, 1, 15),
+    ))
+    db.session.commit()
+    archive_before(datetime(2020, 2, 1))
+    db.session.execute(db.delete(ArchiveWatermark))
+    db.session.commit()
+
+    ledger = source_for(InventoryTransaction.__table__, datetime(2026, 1, 1))
+    assert db.session.execute(db.select(db.func.count()).select_from(ledger)).scalar() == 1
+
+
+def test_rows_arriving_mid_month_stay_with_their_children(product, monkeypatch):
+    import archive
+    add_order(product, datetime(2020, 6, 1))
+    db.session.commit()
+
+    original = archive._move
+    late = []
+
+    def move(source, target, condition):
+        original(source, target, condition)
+        if not late:
+            late.append(add_order(product, datetime(2020, 6, 2)).id)
+
+    monkeypatch.setattr(archive, '_move', move)
+    moved = archive_before(datetime(2021, 1, 1))
+
+    assert moved[Order.__table__.name] == 1
+    assert [o.id for o in Order.query] == late
+    assert [i.order_id for i in OrderItem.query] == late
+
+
+def test_gaps_between_months_create_no_tables(product):
+    import archive
+    for created_at in (datetime(2016, 3, 1), datetime(2025, 11, 30)):
+        db.session.add(InventoryTransaction(
+            product_id=product.id, transaction_type='in', quantity=1, created_at=created_at,
+        ))
+    db.session.commit()
+
+    archive_before(datetime(2026, 1, 1))
+
+    ledger = InventoryTransaction.__table__
+    assert [t.name for t in archive.archive_tables(ledger)] == [
+        archive.archive_name(ledger, datetime(2016, 3, 1)),
+        archive.archive_name(ledger, datetime(2025, 11, 1)),
+    ]
+    assert archive.watermark(ledger) == datetime(2026, 1, 1)
+    assert InventoryTransaction.query.count() == 0
@@ -0,0 +1,138 @@
+import json
+from decimal import Decimal
+from fnmatch import fnmatch
+
+import pytest
+
+from models import db, InventoryTransaction, Product
+from cache import LocalBackend, RedisBackend, product_cache, get_product
+from reservations import reserve_items
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    product_cache.backend.clear()
+
+
+def test_lru_evicts_oldest():
+    backend = LocalBackend(maxsize=2)
+    for key in (1, 2, 1, 3):
+        backend.set(key, key)
+    assert backend.get(2) is None
+    assert backend.get(1) == 1
+    assert backend.evictions == 1
+
+
+def test_update_invalidates_on_commit(product):
+    assert get_product(product.id)['name'] == 'Widget'
+    product.name = 'Gadget'
+    db.session.commit()
+    assert get_product(product.id)['name'] == 'Gadget'
+
+
+def test_bulk_stock_change_invalidates(product):
+    get_product(product.id)
+    reserve_items([(product.id, 3)])
+    db.session.commit()
+    assert get_product(product.id)['stock_quantity'] == 7
+
+
+def test_ledger_insert_invalidates(product):
+    get_product(product.id)
+    db.session.add(InventoryTransaction(product_id=product.id, transaction_type='in', quantity=1))
+    product.stock_quantity += 1
+    db.session.commit()
+    assert get_product(product.id)['stock_quantity'] == 11
+
+
+def test_uncommitted_value_does_not_survive_rollback(product):
+    product.stock_quantity = 999
+    db.session.flush()
+    assert get_product(product.id)['stock_quantity'] == 999
+    db.session.rollback()
+
+    assert db.session.get(Product, product.id).stock_quantity == 10
+    assert get_product(product.id)['stock_quantity'] == 10
+
+
+def test_savepoint_rollback_keeps_outer_writes_uncached(product):
+    product.stock_quantity = 999
+    db.session.flush()
+    db.session.begin_nested().rollback()
+    assert get_product(product.id)['stock_quantity'] == 999
+    db.session.rollback()
+
+    assert get_product(product.id)['stock_quantity'] == 10
+
+
+def test_savepoint_commit_does_not_settle_outer_writes(product):
+    product.stock_quantity = 999
+    db.session.flush()
+    db.session.begin_nested().commit()
+    get_product(product.id)
+    db.session.rollback()
+
+    assert get_product(product.id)['stock_quantity'] == 10
+
+
+class DictRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, pattern):
+        return [key for key in self.data if fnmatch(key, pattern)]
+
+    def info(self, section):
+        return {'evicted_keys': 3}
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    client = DictRedis()
+    monkeypatch.setattr(product_cache, 'backend', RedisBackend(client, ttl=60))
+    return client
+
+
+def test_redis_backend_round_trip(product, redis_cache):
+    product.price = Decimal('19.99')
+    db.session.commit()
+
+    assert get_product(product.id)['price'] == Decimal('19.99')
+    assert redis_cache.ttls == {f'product:{product.id}': 60}
+    cached = get_product(product.id)
+    assert cached == {'id': product.id, 'name': 'Widget', 'price': Decimal('19.99'), 'stock_quantity': 10}
+    assert product_cache.metrics()['evictions'] == 3
+
+
+def test_redis_backend_invalidated_on_commit(product, redis_cache):
+    get_product(product.id)
+    product.stock_quantity = 4
+    db.session.commit()
+
+    assert redis_cache.data == {}
+    assert get_product(product.id)['stock_quantity'] == 4
+
+
+def test_fakeredis_backend(product, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    monkeypatch.setattr(product_cache, 'backend', RedisBackend(fakeredis.FakeRedis()))
+    assert get_product(product.id)['name'] == 'Widget'
+    assert get_product(product.id)['name'] == 'Widget'
+
+
+def test_redis_backend_stores_plain_json(product, redis_cache):
+    get_product(product.id)
+    stored = json.loads(redis_cache.data[f'product:{product.id}'])
+    assert stored['price'] == '2.00'
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from models import db, InventoryTransaction
+from archive import archive_before
+from export import export_csv, export_jsonl
+
+
+def add_ledger(product, count, start=datetime(2026, 1, 1)):
+    for n in range(count):
+        db.session.add(InventoryTransaction(
+            product_id=product.id, transaction_type='in', quantity=1, created_at=start + timedelta(hours=n),
+        ))
+    db.session.commit()
+
+
+def test_export_resumes_after_watermark(product):
+    add_ledger(product, 5)
+    first = io.StringIO()
+    result = export_jsonl('inventory_transactions', first, batch_size=2)
+    assert result.rows == 5
+    assert result.watermark == (datetime(2026, 1, 1, 4), 5)
+
+    add_ledger(product, 2, start=datetime(2026, 1, 2))
+    resumed = io.StringIO()
+    result = export_jsonl('inventory_transactions', resumed, after=result.watermark)
+    assert [json.loads(line)['id'] for line in resumed.getvalue().splitlines()] == [6, 7]
+
+
+def test_export_csv_writes_header(product):
+    add_ledger(product, 3)
+    f = io.StringIO()
+    export_csv('inventory_transactions', f)
+    rows = list(csv.reader(io.StringIO(f.getvalue())))
+    assert rows[0][:2] == ['id', 'product_id']
+    assert len(rows) == 4
+
+
+def test_export_leaves_connection_options_alone(product):
+    add_ledger(product, 3)
+    export_jsonl('inventory_transactions', io.StringIO(), batch_size=2)
+    options = db.session.connection().get_execution_options()
+    assert 'stream_results' not in options
+    assert 'yield_per' not in options
+
+
+def test_export_includes_archived_rows(product):
+    add_ledger(product, 4, start=datetime(2020, 1, 31, 22))
+    archive_before(datetime(2020, 2, 1))
+    assert InventoryTransaction.query.count() == 2
+
+    f = io.StringIO()
+    result = export_jsonl('inventory_transactions', f, batch_size=3)
+    assert result.rows == 4
+    assert [json.loads(line)['id'] for line in f.getvalue().splitlines()] == [1, 2, 3, 4]
+
+    resumed = export_jsonl('inventory_transactions', io.StringIO(), after=(datetime(2020, 1, 31, 22), 1))
+    assert resumed.rows == 3
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from models import db, InventoryTransaction, Order, OrderItem
+from ingest import ingest_orders, read_jsonl
+
+
+def test_ingest_jsonl_parses_created_at(product, tmp_path):
+    path = tmp_path / 'orders.jsonl'
+    path.write_text(json.dumps({
+        'customer_name': 'Ada',
+        'customer_email': 'ada@example.com',
+        'created_at': '2026-03-04T05:06:07',
+        'items': [{'product_id': product.id, 'quantity': 3, 'unit_price': 1.1}],
+    }) + '\n')
+
+    assert ingest_orders(read_jsonl(path)) == 1
+
+    order = Order.query.one()
+    assert order.created_at == datetime(2026, 3, 4, 5, 6, 7)
+    assert InventoryTransaction.query.one().created_at == order.created_at
+    assert str(OrderItem.query.one().unit_price) == '1.10'
+    assert db.session.get(type(product), product.id).stock_quantity == 7
+
+
+def test_ingest_does_not_mutate_records(product):
+    record = {
+        'customer_name': 'Ada',
+        'customer_email': 'ada@example.com',
+        'items': [{'product_id': product.id, 'quantity': 1}],
+    }
+
+    ingest_orders([record])
+
+    assert record['items'] == [{'product_id': product.id, 'quantity': 1}]
+
+
+def test_unknown_product_without_price_is_rejected(app):
+    record = {
+        'customer_name': 'Ada',
+        'customer_email': 'ada@example.com',
+        'items': [{'product_id': 404, 'quantity': 1}],
+    }
+    with pytest.raises(ValueError, match='404'):
+        ingest_orders([record])
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import insert
+
+from models import db, ORDER_LOADING_PROFILES, Order, OrderItem, Product
+from instrumentation import QueryCounter
+
+
+@pytest.fixture
+def orders(app):
+    db.session.execute(insert(Product.__table__), [{'name': f'sku-{n}', 'price': 1} for n in range(20)])
+    db.session.execute(insert(Order.__table__), [
+        {'customer_name': 'Ada', 'customer_email': 'ada@example.com', 'total_amount': 0} for _ in range(120)
+    ])
+    db.session.execute(insert(OrderItem.__table__), [
+        {'order_id': n // 3 + 1, 'product_id': n % 20 + 1, 'quantity': 1, 'unit_price': 1} for n in range(360)
+    ])
+    db.session.commit()
+
+
+def render_page(per_page, profile):
+    db.session.expunge_all()
+    with QueryCounter(db.engine) as counter:
+        for order in Order.page(1, per_page, profile):
+            for item in order.order_items:
+                item.product.name
+    return counter.count
+
+
+@pytest.mark.parametrize('profile', sorted(ORDER_LOADING_PROFILES))
+def test_page_query_count_is_independent_of_page_size(orders, profile):
+    assert render_page(10, profile) == render_page(100, profile)
+
+
+def test_lazy_loading_grows_with_page_size(orders):
+    def lazy(per_page):
+        db.session.expunge_all()
+        with QueryCounter(db.engine) as counter:
+            for order in Order.query.limit(per_page):
+                for item in order.order_items:
+                    item.product.name
+        return counter.count
+
+    assert lazy(100) > lazy(10)
@@ -0,0 +1,31 @@
+import random
+
+import pytest
+from sqlalchemy import text
+
+from models import db
+
+from benchmarks.query_plans import hot_queries, query_plan, seed, uses_index
+
+PRODUCTS = 50
+ORDERS = 2000
+
+
+@pytest.fixture
+def seeded(app):
+    seed(PRODUCTS, ORDERS, 3, 10000, random.Random(0))
+    db.session.execute(text('ANALYZE'))
+
+
+@pytest.mark.parametrize('name', sorted(hot_queries(PRODUCTS, ORDERS)))
+def test_hot_query_uses_index(seeded, name):
+    plan = query_plan(hot_queries(PRODUCTS, ORDERS)[name](random.Random(0)))
+    assert uses_index(plan), plan
+
+
+def test_uses_index_rejects_scans_and_sorts():
+    assert not uses_index(['SCAN order'])
+    assert not uses_index(['SEARCH order USING INDEX ix (status=?)', 'USE TEMP B-TREE FOR ORDER BY'])
+    assert not uses_index(['Seq Scan on "order"'])
+    assert not uses_index(['SCAN order USING INDEX ix_order_created_at'])
+    assert uses_index(['SEARCH order USING INDEX ix_order_status_created_at (status=?)'])
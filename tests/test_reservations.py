@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from models import db, Product, StockReservation
+from reservations import (
+    InsufficientStock, release_expired_reservations, release_reservations, reserve_items,
+)
+
+
+@pytest.fixture
+def products(app):
+    products = [Product(name='Widget', price=2, stock_quantity=10), Product(name='Gadget', price=3, stock_quantity=1)]
+    db.session.add_all(products)
+    db.session.commit()
+    return products
+
+
+def stock(product):
+    return db.session.get(Product, product.id).stock_quantity
+
+
+def test_core_insert_gets_initial_version(app):
+    db.session.execute(insert(Product.__table__), [{'name': 'Bulk', 'price': 1}])
+    assert db.session.execute(db.select(Product.version)).scalar() == 1
+
+
+def test_insufficient_stock_restores_other_skus(products):
+    widget, gadget = products
+    with pytest.raises(InsufficientStock) as excinfo:
+        reserve_items([(widget.id, 4), (gadget.id, 2)])
+
+    assert excinfo.value.product_ids == [gadget.id]
+    assert stock(widget) == 10
+    assert stock(gadget) == 1
+    assert StockReservation.query.count() == 0
+
+
+def test_duplicate_skus_are_merged(products):
+    widget, _ = products
+    reservations = reserve_items([(widget.id, 2), (widget.id, 3)])
+
+    assert [(r.product_id, r.quantity) for r in reservations] == [(widget.id, 5)]
+    assert stock(widget) == 5
+
+
+def test_expired_reservations_are_released_once(products):
+    widget, _ = products
+    reservations = reserve_items([(widget.id, 4)], ttl=timedelta(seconds=-1))
+    db.session.commit()
+
+    assert release_expired_reservations() == 1
+    assert release_expired_reservations() == 0
+    assert release_reservations(reservations) == 0
+    db.session.commit()
+    assert stock(widget) == 10
+
+
+def test_unexpired_reservations_are_kept(products):
+    widget, _ = products
+    reserve_items([(widget.id, 4)])
+    assert release_expired_reservations(datetime.utcnow()) == 0
+    assert stock(widget) == 6
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from models import db, InventoryTransaction, Product, StockSnapshot
+from instrumentation import QueryCounter
+from reservations import commit_reservations, reserve_items
+from snapshots import rebuild_snapshots, reconcile, record_ledger_rows, stock_at
+
+
+def test_stock_at_uses_snapshot_and_same_day_delta(product):
+    start = datetime(2026, 1, 1, 12)
+    for day in range(3):
+        db.session.add(InventoryTransaction(
+            product_id=product.id, transaction_type='in', quantity=5, created_at=start + timedelta(days=day),
+        ))
+    db.session.add(InventoryTransaction(
+        product_id=product.id, transaction_type='out', quantity=2, created_at=start + timedelta(days=1, hours=1),
+    ))
+    db.session.commit()
+
+    assert stock_at(product.id, start + timedelta(days=1)) == 10
+    assert stock_at(product.id, start + timedelta(days=1, hours=2)) == 8
+    assert stock_at(product.id, start + timedelta(days=5)) == 13
+
+
+def test_reconcile_accounts_for_reservations(product):
+    db.session.add(InventoryTransaction(product_id=product.id, transaction_type='in', quantity=10))
+    db.session.commit()
+    assert reconcile() == []
+
+    commit_reservations(reserve_items([(product.id, 2)]))
+    reserve_items([(product.id, 3)])
+    db.session.commit()
+
+    assert db.session.get(Product, product.id).stock_quantity == 5
+    assert reconcile() == []
+    ledger = InventoryTransaction.query.filter_by(transaction_type='out').one()
+    assert (ledger.quantity, ledger.notes) == (2, 'Reservation 1')
+    assert stock_at(product.id, datetime.utcnow()) == 8
+
+
+def snapshot_rows():
+    return db.session.execute(
+        db.select(StockSnapshot.product_id, StockSnapshot.period_start, StockSnapshot.net_quantity, StockSnapshot.balance)
+        .order_by(StockSnapshot.product_id, StockSnapshot.period_start)
+    ).all()
+
+
+def test_batched_snapshots_match_rebuild(product):
+    other = Product(name='Gadget', price=3)
+    db.session.add(other)
+    db.session.commit()
+    start = datetime(2026, 1, 10)
+    batches = [
+        [(product.id, 'in', 10, 0), (other.id, 'in', 4, 0)],
+        [(product.id, 'out', 3, 2), (product.id, 'in', 5, 3), (product.id, 'out', 1, 3), (other.id, 'out', 1, 1)],
+        [(product.id, 'in', 7, -2), (product.id, 'out', 2, 2), (other.id, 'in', 2, 5)],
+    ]
+    for batch in batches:
+        rows = [
+            {'product_id': pid, 'transaction_type': kind, 'quantity': qty, 'created_at': start + timedelta(days=day)}
+            for pid, kind, qty, day in batch
+        ]
+        db.session.execute(db.insert(InventoryTransaction.__table__), rows)
+        with QueryCounter(db.engine) as counter:
+            record_ledger_rows(db.session.connection(), rows)
+        assert counter.count <= 3
+    incremental = snapshot_rows()
+
+    rebuild_snapshots()
+    assert snapshot_rows() == incremental
+    assert stock_at(product.id, start + timedelta(days=30)) == 16
+
+
+def test_upsert_compiles_for_postgres():
+    from sqlalchemy.dialects import postgresql
+    from snapshots import _upsert
+    sql = str(_upsert('postgresql').compile(dialect=postgresql.dialect()))
+    assert 'ON CONFLICT (product_id, period_start) DO UPDATE' in sql
@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from models import db, Order, OrderItem
+from ingest import ingest_orders
+from totals import line_items, order_totals, recompute_order_totals
+
+
+def test_supplied_total_is_exact(product):
+    ingest_orders([{
+        'customer_name': 'Ada',
+        'customer_email': 'ada@example.com',
+        'total_amount': 0.1 + 0.2,
+        'items': [{'product_id': product.id, 'quantity': 1, 'unit_price': 0.3}],
+    }])
+    stored = db.session.execute(text('SELECT total_amount FROM "order"')).scalar()
+    assert Decimal(str(stored)) == Decimal('0.3')
+
+
+def test_recompute_order_totals(product):
+    orders = [Order(customer_name='Ada', customer_email='ada@example.com', total_amount=0) for _ in range(2)]
+    db.session.add_all(orders)
+    db.session.flush()
+    db.session.add_all([
+        OrderItem(order_id=orders[0].id, product_id=product.id, quantity=3, unit_price=Decimal('0.10')),
+        OrderItem(order_id=orders[0].id, product_id=product.id, quantity=1, unit_price=Decimal('19.99')),
+        OrderItem(order_id=orders[1].id, product_id=product.id, quantity=2, unit_price=Decimal('5.05')),
+    ])
+    db.session.commit()
+
+    assert recompute_order_totals() == 2
+    db.session.commit()
+
+    expected = {orders[0].id: Decimal('20.29'), orders[1].id: Decimal('10.10')}
+    assert {o.id: o.total_amount for o in Order.query} == expected
+    assert order_totals(line_items()) == expected
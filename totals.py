@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+
+from models import db, Order, OrderItem
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CENT = Decimal('0.01')
+
+
+def recompute_order_totals(order_ids=None):
+    # A single UPDATE ... FROM (SELECT ... GROUP BY order_id); orders without
+    # line items keep their stored total.
+    totals = (
+        select(OrderItem.order_id, func.sum(OrderItem.quantity * OrderItem.unit_price).label('total'))
+        .group_by(OrderItem.order_id)
+    )
+    if order_ids is not None:
+        totals = totals.where(OrderItem.order_id.in_(order_ids))
+    totals = totals.subquery()
+
+    order = Order.__table__
+    result = db.session.execute(
+        update(order)
+        .where(order.c.id == totals.c.order_id)
+        .values(total_amount=totals.c.total)
+    )
+    return result.rowcount
+
+
+def line_items(order_ids=None):
+    stmt = select(OrderItem.order_id, OrderItem.quantity, OrderItem.unit_price)
+    if order_ids is not None:
+        stmt = stmt.where(OrderItem.order_id.in_(order_ids))
+    return db.session.execute(stmt)
+
+
+def order_totals_array(rows):
+    if np is None:
+        raise ImportError('order_totals_array() requires numpy')
+    order_ids, quantities, prices = (np.asarray(column) for column in zip(*rows))
+    # Work in integer minor units; float64 bincount is exact below 2**53 cents.
+    cents = np.rint(prices.astype(np.float64) * 100).astype(np.int64) * quantities.astype(np.int64)
+    ids, inverse = np.unique(order_ids, return_inverse=True)
+    return ids, np.bincount(inverse, weights=cents).astype(np.int64)
+
+
+def order_totals(rows):
+    rows = list(rows)
+    if not rows:
+        return {}
+    if np is not None:
+        ids, cents = order_totals_array(rows)
+        return {int(i): Decimal(int(c)) * CENT for i, c in zip(ids, cents)}
+
+    totals = {}
+    for order_id, quantity, unit_price in rows:
+        totals[order_id] = totals.get(order_id, 0) + quantity * Decimal(unit_price)
+    return {order_id: total.quantize(CENT) for order_id, total in totals.items()}